@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import gzip
+import shutil
+import hashlib
+import argparse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+APP_DIR = os.environ.get("APP_DIR", "/srv/app")
+STORAGE_PATH = os.environ.get("CKAN_STORAGE_PATH", "/var/lib/ckan")
+
+STATIC_ROOT = os.environ.get("CKAN_STATIC_ROOT", os.path.join(APP_DIR, "static"))
+WEBASSETS_PATH = os.environ.get(
+    "CKAN__WEBASSETS__PATH", os.path.join(STORAGE_PATH, "webassets")
+)
+
+EXTENSIONS = {
+    "tacc_theme": "src/ckanext-tacc_theme/ckanext/tacc_theme/public",
+    "dso_scheming": "src/ckanext-dso_scheming/ckanext/dso_scheming/public",
+    "tapisfilestore": "src/ckanext-tapisfilestore/ckanext/tapisfilestore/public",
+}
+
+# Only text formats are worth precompressing, images are already compressed
+COMPRESSIBLE = (".css", ".js", ".map", ".json", ".svg", ".ico", ".txt", ".html")
+
+HASH_LENGTH = 12
+
+# Requested on a fixed URL, also copied under plain/root/ with their name
+UNHASHED = ("favicon.ico",)
+
+
+def file_hash(path):
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def fingerprint(rel_path, digest):
+
+    root, ext = os.path.splitext(rel_path)
+    return "{0}.{1}{2}".format(root, digest, ext)
+
+
+def write_variants(src, rel_path, static_root):
+    """
+    Copy `src` to `plain/<rel_path>` and, for text formats, write a gzip
+    sibling (`.gz`, picked up by nginx gzip_static) and a brotli copy under
+    `br/<rel_path>` that keeps the original extension so nginx can serve
+    it with the right Content-Type.
+    """
+
+    plain = os.path.join(static_root, "plain", rel_path)
+    if os.path.exists(plain) and os.path.getsize(plain) == os.path.getsize(src):
+        return False
+
+    os.makedirs(os.path.dirname(plain), exist_ok=True)
+    shutil.copyfile(src, plain)
+
+    if not rel_path.lower().endswith(COMPRESSIBLE):
+        return True
+
+    with open(src, "rb") as f:
+        data = f.read()
+
+    with gzip.open(plain + ".gz", "wb", compresslevel=9) as f:
+        f.write(data)
+
+    if brotli is not None:
+        br = os.path.join(static_root, "br", rel_path)
+        os.makedirs(os.path.dirname(br), exist_ok=True)
+        with open(br, "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+
+    return True
+
+
+def collect_public(static_root, app_dir=APP_DIR):
+    """
+    Collect the public/ directory of each extension with content-hashed
+    filenames. Returns the manifest mapping the URL CKAN serves the file on
+    to its fingerprinted URL under /static/.
+    """
+
+    manifest = {}
+    for name, public_dir in sorted(EXTENSIONS.items()):
+        public_dir = os.path.join(app_dir, public_dir)
+        if not os.path.isdir(public_dir):
+            print("[collect_static] {0} not found, skipping".format(public_dir))
+            continue
+
+        copied = 0
+        for dirpath, dirnames, filenames in os.walk(public_dir):
+            for filename in filenames:
+                if filename.startswith("."):
+                    continue
+                src = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(src, public_dir).replace(os.sep, "/")
+                hashed = "{0}/{1}".format(name, fingerprint(rel_path, file_hash(src)))
+
+                if write_variants(src, hashed, static_root):
+                    copied += 1
+                manifest["/" + rel_path] = "/static/" + hashed
+
+                if rel_path in UNHASHED:
+                    root_copy = os.path.join(static_root, "plain", "root", rel_path)
+                    os.makedirs(os.path.dirname(root_copy), exist_ok=True)
+                    shutil.copyfile(src, root_copy)
+
+        print("[collect_static] {0}: {1} new files".format(name, copied))
+
+    return manifest
+
+
+def collect_webassets(static_root, webassets_path=WEBASSETS_PATH):
+    """
+    Collect the webassets output. Bundle filenames already carry the
+    %(version)s hash so they are copied with their names unchanged.
+    """
+
+    if not os.path.isdir(webassets_path):
+        print("[collect_static] {0} not found, skipping webassets".format(
+            webassets_path))
+        return
+
+    copied = 0
+    for dirpath, dirnames, filenames in os.walk(webassets_path):
+        # The webassets cache is not served
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for filename in filenames:
+            if filename.startswith("."):
+                continue
+            src = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(src, webassets_path).replace(os.sep, "/")
+            if write_variants(src, "webassets/" + rel_path, static_root):
+                copied += 1
+
+    print("[collect_static] webassets: {0} new files".format(copied))
+
+
+def write_manifest(static_root, manifest):
+
+    path = os.path.join(static_root, "manifest.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    # Atomic so running workers never read a half written manifest
+    os.replace(tmp_path, path)
+    print("[collect_static] Manifest written to {0}".format(path))
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description="Collect extension static files for nginx")
+    parser.add_argument("--static-root", default=STATIC_ROOT)
+    parser.add_argument("--webassets-path", default=WEBASSETS_PATH)
+    parser.add_argument("--app-dir", default=APP_DIR)
+    args = parser.parse_args(argv)
+
+    if brotli is None:
+        print("[collect_static] brotli not installed, only gzip variants will be written")
+
+    os.makedirs(args.static_root, exist_ok=True)
+    manifest = collect_public(args.static_root, args.app_dir)
+    collect_webassets(args.static_root, args.webassets_path)
+    write_manifest(args.static_root, manifest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+#!/bin/sh
+set -e
+
+# Build the auth file from the same credentials used to create the roles in
+# postgresql/docker-entrypoint-initdb.d
+: > /tmp/userlist.txt
+chmod 600 /tmp/userlist.txt
+for pair in \
+    "$POSTGRES_USER:$POSTGRES_PASSWORD" \
+    "$CKAN_DB_USER:$CKAN_DB_PASSWORD" \
+    "$DATASTORE_READONLY_USER:$DATASTORE_READONLY_PASSWORD"
+do
+    user="${pair%%:*}"
+    password="${pair#*:}"
+    if [ -n "$user" ] && [ -n "$password" ]; then
+        echo "\"$user\" \"$password\"" >> /tmp/userlist.txt
+    fi
+done
+
+# Pool sizes can be tuned without rebuilding the image. The config is
+# rendered to /tmp as the pgbouncer user can't write to /etc/pgbouncer
+sed \
+    -e "s/^default_pool_size = .*/default_pool_size = ${PGBOUNCER_DEFAULT_POOL_SIZE:-20}/" \
+    -e "s/^max_client_conn = .*/max_client_conn = ${PGBOUNCER_MAX_CLIENT_CONN:-1000}/" \
+    /etc/pgbouncer/pgbouncer.ini > /tmp/pgbouncer.ini
+
+exec pgbouncer /tmp/pgbouncer.ini
@@ -0,0 +1,90 @@
+#!/bin/bash
+# Size the PostgreSQL memory and planner settings to the memory limit of the
+# container (mem_limit of the db service) and the CPUs of the host. Without
+# a limit the whole host memory would be used, which Solr, CKAN and the
+# other services share. Runs on the first start of an empty volume; on
+# an existing one run it manually and restart the db service:
+#
+#   docker compose exec db bash /docker-entrypoint-initdb.d/40_tune_postgres.sh
+#   docker compose restart db
+#
+# POSTGRES_MEMORY_MB overrides the detected memory, POSTGRES_STORAGE=hdd uses
+# spinning disk costs and POSTGRES_TUNING=off skips the script.
+set -e
+
+if [ "${POSTGRES_TUNING:-on}" = "off" ]; then
+    echo "POSTGRES_TUNING=off, keeping the default settings"
+    exit 0
+fi
+
+detect_memory_mb() {
+    local limit=""
+    if [ -r /sys/fs/cgroup/memory.max ]; then
+        limit=$(cat /sys/fs/cgroup/memory.max)
+    elif [ -r /sys/fs/cgroup/memory/memory.limit_in_bytes ]; then
+        limit=$(cat /sys/fs/cgroup/memory/memory.limit_in_bytes)
+    fi
+    local total_kb
+    total_kb=$(awk '/^MemTotal:/ { print $2 }' /proc/meminfo)
+    local total_mb=$((total_kb / 1024))
+
+    # No limit is reported as "max" (cgroup v2) or a huge number (cgroup v1)
+    if [ -n "$limit" ] && [ "$limit" != "max" ]; then
+        local limit_mb=$((limit / 1024 / 1024))
+        if [ "$limit_mb" -lt "$total_mb" ]; then
+            echo "$limit_mb"
+            return
+        fi
+    fi
+    echo "$total_mb"
+}
+
+MEMORY_MB=${POSTGRES_MEMORY_MB:-$(detect_memory_mb)}
+CPUS=$(nproc)
+MAX_CONNECTIONS=${POSTGRES_MAX_CONNECTIONS:-100}
+
+SHARED_BUFFERS_MB=$((MEMORY_MB / 4))
+EFFECTIVE_CACHE_SIZE_MB=$((MEMORY_MB * 3 / 4))
+MAINTENANCE_WORK_MEM_MB=$((MEMORY_MB / 16))
+[ "$MAINTENANCE_WORK_MEM_MB" -gt 2048 ] && MAINTENANCE_WORK_MEM_MB=2048
+# A query can use work_mem several times (sorts, hashes), leave room for that
+WORK_MEM_KB=$(((MEMORY_MB - SHARED_BUFFERS_MB) * 1024 / (MAX_CONNECTIONS * 3)))
+[ "$WORK_MEM_KB" -lt 4096 ] && WORK_MEM_KB=4096
+
+# Background workers also cover the logical replication launcher, never
+# go below the PostgreSQL default
+MAX_WORKER_PROCESSES=$CPUS
+[ "$MAX_WORKER_PROCESSES" -lt 8 ] && MAX_WORKER_PROCESSES=8
+
+PARALLEL_PER_GATHER=$((CPUS / 2))
+[ "$PARALLEL_PER_GATHER" -gt 4 ] && PARALLEL_PER_GATHER=4
+[ "$PARALLEL_PER_GATHER" -lt 1 ] && PARALLEL_PER_GATHER=1
+
+if [ "${POSTGRES_STORAGE:-ssd}" = "hdd" ]; then
+    RANDOM_PAGE_COST=4
+    EFFECTIVE_IO_CONCURRENCY=2
+else
+    RANDOM_PAGE_COST=1.1
+    EFFECTIVE_IO_CONCURRENCY=200
+fi
+
+echo "Tuning PostgreSQL for ${MEMORY_MB}MB of memory, ${CPUS} CPUs and ${MAX_CONNECTIONS} connections"
+
+# ALTER SYSTEM writes postgresql.auto.conf in the data volume, the settings
+# are picked up when the server restarts at the end of the initialization
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" <<-EOSQL
+    ALTER SYSTEM SET max_connections = '${MAX_CONNECTIONS}';
+    ALTER SYSTEM SET shared_buffers = '${SHARED_BUFFERS_MB}MB';
+    ALTER SYSTEM SET effective_cache_size = '${EFFECTIVE_CACHE_SIZE_MB}MB';
+    ALTER SYSTEM SET maintenance_work_mem = '${MAINTENANCE_WORK_MEM_MB}MB';
+    ALTER SYSTEM SET work_mem = '${WORK_MEM_KB}kB';
+    ALTER SYSTEM SET random_page_cost = '${RANDOM_PAGE_COST}';
+    ALTER SYSTEM SET effective_io_concurrency = '${EFFECTIVE_IO_CONCURRENCY}';
+    ALTER SYSTEM SET checkpoint_completion_target = '0.9';
+    ALTER SYSTEM SET wal_buffers = '16MB';
+    ALTER SYSTEM SET min_wal_size = '1GB';
+    ALTER SYSTEM SET max_wal_size = '4GB';
+    ALTER SYSTEM SET max_worker_processes = '${MAX_WORKER_PROCESSES}';
+    ALTER SYSTEM SET max_parallel_workers = '${CPUS}';
+    ALTER SYSTEM SET max_parallel_workers_per_gather = '${PARALLEL_PER_GATHER}';
+EOSQL
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Load test CKAN with concurrent API clients and report the request latency and
+the number of PostgreSQL server connections opened meanwhile.
+
+Run it once with the CKAN_*_URL settings pointing at db and once pointing at
+pgbouncer:6432 to compare direct connections with transaction pooling:
+
+    ./scripts/database/benchmark-pooling.py --label direct
+    ./scripts/database/benchmark-pooling.py --label pgbouncer --clients 100
+
+Connections are sampled from pg_stat_activity through `docker compose exec`,
+so run it from the repository root on the Docker host.
+"""
+
+import argparse
+import json
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+CONNECTIONS_SQL = (
+    "SELECT count(*) FROM pg_stat_activity "
+    "WHERE backend_type = 'client backend' AND pid <> pg_backend_pid()"
+)
+
+
+def read_env_file(path):
+
+    env = {}
+    if not os.path.exists(path):
+        return env
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, value = line.split("=", 1)
+                env[key] = value
+    return env
+
+
+def count_connections(postgres_user):
+
+    output = subprocess.run(
+        ["docker", "compose", "exec", "-T", "db",
+         "psql", "-U", postgres_user, "-Atc", CONNECTIONS_SQL],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return int(output.strip())
+
+
+class ConnectionSampler(threading.Thread):
+    """Poll the server connection count until stopped"""
+
+    def __init__(self, postgres_user, interval):
+        super().__init__(daemon=True)
+        self.postgres_user = postgres_user
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.samples.append(count_connections(self.postgres_user))
+            except (subprocess.CalledProcessError, ValueError) as e:
+                print("Could not sample pg_stat_activity: {0}".format(e), file=sys.stderr)
+                return
+            self.stopped.wait(self.interval)
+
+
+def build_requests(site_url, resource_id):
+
+    api = site_url.rstrip("/") + "/api/3/action/"
+    urls = [
+        api + "package_search?" + urlencode({"q": "*:*", "rows": 10}),
+        api + "package_search?" + urlencode({"q": "rain", "rows": 10}),
+        api + "status_show",
+    ]
+    if resource_id:
+        urls.append(api + "datastore_search?" + urlencode(
+            {"resource_id": resource_id, "limit": 100}))
+    return urls
+
+
+def timed_request(url, context, api_token):
+
+    request = Request(url)
+    if api_token:
+        request.add_header("Authorization", api_token)
+    start = time.perf_counter()
+    try:
+        with urlopen(request, timeout=60, context=context) as response:
+            response.read()
+        ok = True
+    except (URLError, OSError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def percentile(values, pct):
+
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def run(args):
+
+    secrets = read_env_file(".env.prod.secrets")
+    postgres_user = secrets.get("POSTGRES_USER", "postgres")
+    urls = build_requests(args.site_url, args.resource_id)
+    context = ssl._create_unverified_context() if args.insecure else None
+
+    baseline = count_connections(postgres_user) if args.sample else None
+    sampler = ConnectionSampler(postgres_user, args.interval)
+    if args.sample:
+        sampler.start()
+
+    jobs = [urls[i % len(urls)] for i in range(args.clients * args.requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        results = list(executor.map(
+            lambda url: timed_request(url, context, args.api_token), jobs))
+    elapsed = time.perf_counter() - start
+
+    sampler.stopped.set()
+    if args.sample:
+        sampler.join()
+
+    latencies = [t * 1000 for t, ok in results if ok]
+    report = {
+        "label": args.label,
+        "clients": args.clients,
+        "requests": len(results),
+        "errors": len(results) - len(latencies),
+        "throughput_rps": round(len(results) / elapsed, 1),
+    }
+    if latencies:
+        report.update({
+            "latency_mean_ms": round(statistics.mean(latencies), 1),
+            "latency_p50_ms": round(percentile(latencies, 50), 1),
+            "latency_p95_ms": round(percentile(latencies, 95), 1),
+            "latency_p99_ms": round(percentile(latencies, 99), 1),
+        })
+    if sampler.samples:
+        report.update({
+            "db_connections_idle": baseline,
+            "db_connections_peak": max(sampler.samples),
+            "db_connections_mean": round(statistics.mean(sampler.samples), 1),
+        })
+    return report
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--site-url", default=os.environ.get("CKAN_SITE_URL", "https://localhost:8443"))
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--resource-id", help="DataStore resource to query with datastore_search")
+    parser.add_argument("--api-token", default=os.environ.get("CKAN_API_TOKEN"))
+    parser.add_argument("--label", default="run", help="Name of this run in the report")
+    parser.add_argument("--interval", type=float, default=0.5, help="Connection sampling interval")
+    parser.add_argument("--no-sample", dest="sample", action="store_false",
+                        help="Don't sample pg_stat_activity")
+    parser.add_argument("--insecure", action="store_true",
+                        help="Don't verify the certificate (self-signed NGINX cert)")
+    parser.add_argument("-o", "--output", help="Append the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(report) + "\n")
+
+
+if __name__ == "__main__":
+    main()
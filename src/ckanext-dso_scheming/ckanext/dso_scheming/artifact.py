@@ -0,0 +1,249 @@
+"""
+Precompiled scheming schemas
+
+ckanext-scheming parses every configured schema and presets file and expands
+the presets in each uwsgi worker. `ckan dso_scheming compile-schemas` does
+that once and writes the result to a single JSON artifact with a checksum.
+`install()` wraps the scheming loaders so that workers load the artifact
+instead, falling back to the source files when it is missing or stale.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+
+import ckan.plugins.toolkit as toolkit
+
+log = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 1
+ARTIFACT_OPTION = 'ckanext.dso_scheming.compiled_schemas'
+DATASET_SCHEMAS_OPTION = 'scheming.dataset_schemas'
+PRESETS_OPTION = 'scheming.presets'
+
+_original = {}
+_artifact = None
+_artifact_loaded = False
+
+
+def _config_urls(config, option, default=''):
+    return config.get(option, default).split()
+
+
+def _default_presets():
+    from ckanext.scheming.plugins import DEFAULT_PRESETS
+    return DEFAULT_PRESETS
+
+
+def _source_path(url):
+    """
+    Return the file path of a "module:file" schema url, or None for
+    remote urls which cannot be checked without fetching them.
+    """
+    if url.startswith(('http://', 'https://')) or ':' not in url:
+        return None
+    module, file_name = url.split(':', 1)
+    try:
+        m = __import__(module, fromlist=[''])
+    except ImportError:
+        return None
+    return os.path.join(os.path.dirname(inspect.getfile(m)), file_name)
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _source_hashes(urls):
+    hashes = {}
+    for url in urls:
+        path = _source_path(url)
+        if path and os.path.exists(path):
+            hashes[url] = _file_hash(path)
+    return hashes
+
+
+def _checksum(payload):
+    data = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _schema_fields(schema):
+    for grouping in ('fields', 'dataset_fields', 'resource_fields'):
+        for field in schema.get(grouping, []):
+            yield field
+            for subfield in field.get('repeating_subfields', []):
+                yield subfield
+            for subfield in field.get('simple_subfields', []):
+                yield subfield
+
+
+def validate_schemas(expanded):
+    """
+    Resolve every validators string in the expanded schemas and return a
+    list of error messages for the ones that can not be resolved.
+    """
+    from ckanext.scheming.validation import validators_from_string
+
+    errors = []
+    for schema_type, schema in expanded.items():
+        for field in _schema_fields(schema):
+            for key in ('validators', 'output_validators'):
+                if key not in field:
+                    continue
+                try:
+                    validators_from_string(field[key], field, schema)
+                except Exception as e:
+                    errors.append('{0}.{1} {2}: {3}'.format(
+                        schema_type, field.get('field_name'), key, e))
+    return errors
+
+
+def load_from_source(dataset_schema_urls, preset_urls):
+    """
+    Parse the schema and presets files and expand the presets the way
+    scheming does, returning (presets, schemas, expanded).
+    """
+    from ckanext.scheming import plugins as scheming
+
+    load_schemas = _original.get('_load_schemas', scheming._load_schemas)
+    expand_schemas = _original.get('_expand_schemas', scheming._expand_schemas)
+
+    # Same precedence as _SchemingMixin._load_presets: the first file wins
+    presets = {
+        field['preset_name']: field['values']
+        for preset_url in reversed(preset_urls)
+        for field in scheming._load_schema(preset_url)['presets']
+    }
+    schemas = load_schemas(dataset_schema_urls, 'dataset_type')
+
+    # _expand_schemas reads the presets from the mixin
+    loaded_presets = scheming._SchemingMixin._presets
+    scheming._SchemingMixin._presets = presets
+    try:
+        expanded = expand_schemas(schemas)
+    finally:
+        scheming._SchemingMixin._presets = loaded_presets
+
+    return presets, schemas, expanded
+
+
+def compile_schemas(dataset_schema_urls, preset_urls):
+    """
+    Load, expand and validate the given dataset schemas and presets and
+    return the artifact dict, checksum included.
+    """
+    presets, schemas, expanded = load_from_source(dataset_schema_urls, preset_urls)
+
+    errors = validate_schemas(expanded)
+    if errors:
+        raise toolkit.ValidationError({'validators': errors})
+
+    payload = {
+        'version': ARTIFACT_VERSION,
+        'dataset_schema_urls': list(dataset_schema_urls),
+        'preset_urls': list(preset_urls),
+        'sources': _source_hashes(list(dataset_schema_urls) + list(preset_urls)),
+        'presets': presets,
+        'schemas': schemas,
+        'expanded': expanded,
+    }
+    # Round trip so the checksum covers exactly what will be loaded
+    payload = json.loads(json.dumps(payload, default=str))
+    payload['checksum'] = _checksum(payload)
+    return payload
+
+
+def write_artifact(path, artifact):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(artifact, f, sort_keys=True, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path):
+    """
+    Load an artifact, returning None if it is missing, corrupt or older than
+    the schema files it was compiled from.
+    """
+    try:
+        with open(path) as f:
+            artifact = json.load(f)
+    except (IOError, ValueError) as e:
+        log.warning('Compiled schemas not loaded from %s: %s', path, e)
+        return None
+
+    checksum = artifact.pop('checksum', None)
+    if artifact.get('version') != ARTIFACT_VERSION or checksum != _checksum(artifact):
+        log.warning('Compiled schemas %s failed the checksum, ignoring it', path)
+        return None
+
+    sources = artifact['sources']
+    if _source_hashes(sources) != sources:
+        log.warning('Compiled schemas %s are stale, ignoring them', path)
+        return None
+
+    artifact['checksum'] = checksum
+    return artifact
+
+
+def get_artifact(config=None):
+    """Load the configured artifact once per process"""
+    global _artifact, _artifact_loaded
+    if not _artifact_loaded:
+        config = config if config is not None else toolkit.config
+        path = config.get(ARTIFACT_OPTION)
+        _artifact = load_artifact(path) if path else None
+        _artifact_loaded = True
+        if _artifact:
+            log.info('Loaded compiled schemas from %s', path)
+    return _artifact
+
+
+def install():
+    """
+    Wrap the scheming loaders so they use the compiled artifact. The config
+    is only read when scheming calls them from update_config, after
+    ckanext-envvars has applied the environment settings.
+    """
+    try:
+        from ckanext.scheming import plugins as scheming
+    except ImportError:
+        log.debug('ckanext-scheming not installed, compiled schemas disabled')
+        return
+
+    if _original:
+        return
+
+    _original['_load_presets'] = scheming._SchemingMixin._load_presets
+    _original['_load_schemas'] = scheming._load_schemas
+    _original['_expand_schemas'] = scheming._expand_schemas
+
+    def _load_presets(config):
+        artifact = get_artifact(config)
+        if (scheming._SchemingMixin._presets is None and artifact and
+                artifact['preset_urls'] == _config_urls(
+                    config, PRESETS_OPTION, _default_presets())):
+            scheming._SchemingMixin._presets = artifact['presets']
+            return
+        return _original['_load_presets'](config)
+
+    def _load_schemas(schemas, type_field):
+        artifact = get_artifact()
+        if (artifact and type_field == 'dataset_type' and
+                list(schemas) == artifact['dataset_schema_urls']):
+            return artifact['schemas']
+        return _original['_load_schemas'](schemas, type_field)
+
+    def _expand_schemas(schemas):
+        artifact = get_artifact()
+        if artifact and schemas is artifact['schemas']:
+            return artifact['expanded']
+        return _original['_expand_schemas'](schemas)
+
+    scheming._SchemingMixin._load_presets = staticmethod(_load_presets)
+    scheming._load_schemas = _load_schemas
+    scheming._expand_schemas = _expand_schemas
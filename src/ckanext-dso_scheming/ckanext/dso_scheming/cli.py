@@ -0,0 +1,87 @@
+import json
+import timeit
+
+import click
+
+import ckan.plugins.toolkit as toolkit
+
+from ckanext.dso_scheming import artifact
+
+
+@click.group()
+def dso_scheming():
+    """dso_scheming commands"""
+    pass
+
+
+def _configured_urls():
+    config = toolkit.config
+    return (
+        artifact._config_urls(config, artifact.DATASET_SCHEMAS_OPTION),
+        artifact._config_urls(config, artifact.PRESETS_OPTION, artifact._default_presets()),
+    )
+
+
+@dso_scheming.command('compile-schemas')
+@click.option('-o', '--output', help='Artifact path, defaults to ckanext.dso_scheming.compiled_schemas')
+def compile_schemas(output):
+    """Compile the configured scheming schemas and presets into one artifact"""
+    output = output or toolkit.config.get(artifact.ARTIFACT_OPTION)
+    if not output:
+        raise click.UsageError(
+            'Pass --output or set {}'.format(artifact.ARTIFACT_OPTION))
+
+    schema_urls, preset_urls = _configured_urls()
+    try:
+        compiled = artifact.compile_schemas(schema_urls, preset_urls)
+    except toolkit.ValidationError as e:
+        for error in e.error_dict['validators']:
+            click.secho(error, fg='red', err=True)
+        raise click.Abort()
+
+    artifact.write_artifact(output, compiled)
+    click.secho('Compiled {} schemas and {} presets to {} (sha256 {})'.format(
+        len(compiled['expanded']), len(compiled['presets']), output,
+        compiled['checksum']), fg='green')
+
+
+@dso_scheming.command('benchmark-schemas')
+@click.option('-n', '--iterations', default=20, show_default=True)
+@click.option('-o', '--output', help='Artifact path, defaults to ckanext.dso_scheming.compiled_schemas')
+def benchmark_schemas(iterations, output):
+    """
+    Time loading the schemas from source against the compiled artifact.
+
+    Only the schema loading each worker does in update_config is measured,
+    not the rest of the worker start up.
+    """
+    output = output or toolkit.config.get(artifact.ARTIFACT_OPTION)
+    if not output:
+        raise click.UsageError(
+            'Pass --output or set {}'.format(artifact.ARTIFACT_OPTION))
+
+    schema_urls, preset_urls = _configured_urls()
+
+    def from_source():
+        # What each worker does at start up without the artifact
+        artifact.load_from_source(schema_urls, preset_urls)
+
+    def from_artifact():
+        if artifact.load_artifact(output) is None:
+            raise click.ClickException(
+                '{} is missing or stale, run compile-schemas first'.format(output))
+
+    results = {}
+    for name, fn in (('source', from_source), ('artifact', from_artifact)):
+        results[name] = min(timeit.repeat(fn, number=1, repeat=iterations)) * 1000
+
+    click.echo(json.dumps({
+        'iterations': iterations,
+        'source_ms': round(results['source'], 2),
+        'artifact_ms': round(results['artifact'], 2),
+        'speedup': round(results['source'] / results['artifact'], 1),
+    }, indent=2))
+
+
+def get_commands():
+    return [dso_scheming]
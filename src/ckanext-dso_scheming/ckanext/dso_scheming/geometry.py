@@ -0,0 +1,122 @@
+"""
+Spatial coverage normalization and index-time precomputation
+
+The spatial field of the dataset schemas takes arbitrary GeoJSON. On save it
+is validated and normalized to a single, valid GeoJSON geometry, the format
+ckanext-spatial expects. At index time the bounding box, centroid and a
+simplified copy of the geometry are computed once and stored with the search
+results, so search maps don't have to load the full geometry.
+"""
+
+import json
+import logging
+
+import shapely
+from shapely.geometry import mapping, shape
+from shapely.ops import unary_union
+
+import ckan.plugins.toolkit as toolkit
+
+log = logging.getLogger(__name__)
+
+SPATIAL_FIELD = 'spatial'
+DEFAULT_SIMPLIFY_TOLERANCE = 0.01
+
+GEOMETRY_TYPES = (
+    'Point', 'MultiPoint', 'LineString', 'MultiLineString',
+    'Polygon', 'MultiPolygon', 'GeometryCollection',
+)
+
+
+def _dumps(geometry):
+    return json.dumps(mapping(geometry), separators=(',', ':'))
+
+
+def normalize_geojson(value):
+    """
+    Return `value` (a GeoJSON string or dict) as a compact GeoJSON geometry
+    string. Features and feature collections are reduced to their geometry,
+    invalid polygons are repaired. Raises ValueError if it can't be used.
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            raise ValueError('not valid JSON')
+    if not isinstance(value, dict):
+        raise ValueError('expected a GeoJSON object')
+
+    geojson_type = value.get('type')
+    if geojson_type == 'Feature':
+        geometries = [value.get('geometry')]
+    elif geojson_type == 'FeatureCollection':
+        features = value.get('features') or []
+        if not isinstance(features, list) or \
+                not all(isinstance(f, dict) for f in features):
+            raise ValueError('features must be a list of GeoJSON Features')
+        geometries = [f.get('geometry') for f in features]
+    elif geojson_type in GEOMETRY_TYPES:
+        geometries = [value]
+    else:
+        raise ValueError('unknown GeoJSON type {0!r}'.format(geojson_type))
+
+    try:
+        shapes = [shape(g) for g in geometries if g]
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError,
+            shapely.errors.GEOSException) as e:
+        raise ValueError('invalid geometry: {0}'.format(e))
+    if not shapes:
+        raise ValueError('no geometry found')
+
+    geometry = shapes[0] if len(shapes) == 1 else unary_union(shapes)
+    if geometry.is_empty:
+        raise ValueError('empty geometry')
+    if not geometry.is_valid:
+        geometry = shapely.make_valid(geometry)
+
+    minx, miny, maxx, maxy = geometry.bounds
+    if minx < -180 or maxx > 180 or miny < -90 or maxy > 90:
+        raise ValueError('coordinates must be longitude, latitude in WGS84')
+
+    return _dumps(geometry)
+
+
+def precompute(geojson, tolerance=DEFAULT_SIMPLIFY_TOLERANCE):
+    """Return the bbox, centroid and simplified geometry of a GeoJSON string"""
+    geometry = shape(json.loads(geojson))
+    centroid = geometry.centroid
+    simplified = geometry.simplify(tolerance, preserve_topology=True)
+    if simplified.is_empty:
+        simplified = geometry.envelope
+    return {
+        'spatial_bbox': list(geometry.bounds),
+        'spatial_centroid': [centroid.x, centroid.y],
+        'spatial_simplified': _dumps(simplified),
+    }
+
+
+def index_spatial(pkg_dict):
+    """
+    Add the precomputed geometries to the dataset dict returned by
+    package_search. The bbox search fields themselves are filled by
+    ckanext-spatial's solr-bbox backend.
+    """
+    geojson = pkg_dict.get(SPATIAL_FIELD) or pkg_dict.get('extras_' + SPATIAL_FIELD)
+    if not geojson or not pkg_dict.get('validated_data_dict'):
+        return pkg_dict
+
+    tolerance = float(toolkit.config.get(
+        'ckanext.dso_scheming.spatial_simplify_tolerance', DEFAULT_SIMPLIFY_TOLERANCE))
+    try:
+        if not isinstance(geojson, str):
+            geojson = json.dumps(geojson)
+        computed = precompute(geojson, tolerance)
+    except (ValueError, TypeError, shapely.errors.GEOSException) as e:
+        log.warning('Not precomputing the spatial coverage of %s: %s',
+                    pkg_dict.get('name'), e)
+        return pkg_dict
+
+    validated = json.loads(pkg_dict['validated_data_dict'])
+    validated.update(computed)
+    pkg_dict['validated_data_dict'] = json.dumps(validated)
+    return pkg_dict
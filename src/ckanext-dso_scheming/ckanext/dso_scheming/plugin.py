@@ -1,9 +1,19 @@
 import ckan.plugins as plugins
 import ckan.plugins.toolkit as toolkit
 
+from ckanext.dso_scheming import artifact, cli, geometry, temporal, validators, views
+
+# Must run before scheming's update_config, plugin modules are all imported
+# before any IConfigurer is called
+artifact.install()
+
 
 class DsoSchemingPlugin(plugins.SingletonPlugin):
     plugins.implements(plugins.IConfigurer)
+    plugins.implements(plugins.IClick)
+    plugins.implements(plugins.IBlueprint)
+    plugins.implements(plugins.IPackageController, inherit=True)
+    plugins.implements(plugins.IValidators)
 
     # IConfigurer
 
@@ -12,3 +22,27 @@ class DsoSchemingPlugin(plugins.SingletonPlugin):
         toolkit.add_public_directory(config_, 'public')
         toolkit.add_resource('fanstatic',
             'dso_scheming')
+
+    # IClick
+
+    def get_commands(self):
+        return cli.get_commands()
+
+    # IBlueprint
+
+    def get_blueprint(self):
+        return views.get_blueprints()
+
+    # IPackageController
+
+    def before_index(self, pkg_dict):
+        pkg_dict = temporal.index_temporal_coverage(pkg_dict)
+        return geometry.index_spatial(pkg_dict)
+
+    def before_search(self, search_params):
+        return temporal.filter_temporal_coverage(search_params)
+
+    # IValidators
+
+    def get_validators(self):
+        return validators.get_validators()
@@ -0,0 +1,198 @@
+"""
+Local autocomplete for the MINT standard variables
+
+The list of standard variables is fetched from the MINT model catalog and
+kept in memory in an index supporting prefix and trigram (substring) lookups,
+so the autocomplete form fields don't hit the remote API on every keystroke.
+The list is refreshed in a background thread once it gets older than
+ckanext.dso_scheming.standard_variables_refresh seconds.
+"""
+
+import bisect
+import functools
+import hashlib
+import heapq
+import logging
+import re
+import threading
+import time
+
+import requests
+
+import ckan.plugins.toolkit as toolkit
+
+log = logging.getLogger(__name__)
+
+DEFAULT_URL = 'https://api.models.mint.tacc.utexas.edu/v1.8.0/standardvariables?username=mint@isi.edu'
+DEFAULT_REFRESH = 24 * 60 * 60
+PER_PAGE = 200
+MAX_PAGES = 100
+RETRY_AFTER_FAILURE = 60
+
+_TOKEN_RE = re.compile(r'[^a-z0-9]+')
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class StandardVariableIndex(object):
+    """
+    In-memory index of standard variable labels.
+
+    Terms shorter than three characters are matched against the start of the
+    label and of each of its words with a binary search, longer ones against
+    any part of the label through a trigram index.
+    """
+
+    def __init__(self, labels):
+        self.labels = sorted(set(label for label in labels if label))
+        self._lowered = [label.lower() for label in self.labels]
+        # Same list, same version in every worker
+        self.version = hashlib.sha1(
+            '\n'.join(self.labels).encode('utf-8')).hexdigest()[:16]
+        self._words = []
+        self._prefixes = []
+        self._trigrams = {}
+
+        for i, label in enumerate(self._lowered):
+            words = tuple(w for w in _TOKEN_RE.split(label) if w)
+            self._words.append(words)
+            for word in set(words + (label,)):
+                self._prefixes.append((word, i))
+            for gram in _trigrams(label):
+                self._trigrams.setdefault(gram, set()).add(i)
+        self._prefixes.sort()
+        # Consecutive keystrokes from many users repeat the same terms
+        self._cached_search = functools.lru_cache(maxsize=4096)(self._search)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _prefix_candidates(self, term):
+        candidates = set()
+        start = bisect.bisect_left(self._prefixes, (term,))
+        for word, i in self._prefixes[start:]:
+            if not word.startswith(term):
+                break
+            candidates.add(i)
+        return candidates
+
+    def _substring_candidates(self, term):
+        postings = [self._trigrams.get(gram) for gram in _trigrams(term)]
+        if not all(postings):
+            return set()
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return {i for i in candidates if term in self._lowered[i]}
+
+    def _rank(self, term, i):
+        label = self._lowered[i]
+        if label == term:
+            rank = 0
+        elif label.startswith(term):
+            rank = 1
+        elif any(w.startswith(term) for w in self._words[i]):
+            rank = 2
+        else:
+            rank = 3
+        return (rank, len(label), label)
+
+    def search(self, term, limit=10):
+        """Return up to `limit` labels matching `term`, best matches first"""
+        term = term.strip().lower()
+        if not term:
+            return []
+        return list(self._cached_search(term, limit))
+
+    def _search(self, term, limit):
+        if len(term) < 3:
+            candidates = self._prefix_candidates(term)
+        else:
+            candidates = self._substring_candidates(term)
+
+        best = heapq.nsmallest(limit, candidates, key=lambda i: self._rank(term, i))
+        return tuple(self.labels[i] for i in best)
+
+
+def _item_label(item):
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        label = item.get('label') or item.get('Name') or item.get('name')
+        if isinstance(label, list):
+            label = label[0] if label else None
+        return label
+
+
+def fetch_standard_variables(url):
+    """Fetch every standard variable label from the model catalog, page by page"""
+    labels = set()
+    separator = '&' if '?' in url else '?'
+    for page in range(1, MAX_PAGES + 1):
+        response = requests.get(
+            '{0}{1}page={2}&per_page={3}'.format(url, separator, page, PER_PAGE),
+            timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        if isinstance(data, dict):
+            data = data.get('ResultSet', {}).get('Result', [])
+
+        found = len(labels)
+        labels.update(label for label in map(_item_label, data) if label)
+        # Stop on the last page, or if the API ignores the paging parameters
+        if len(data) < PER_PAGE or len(labels) == found:
+            break
+    return labels
+
+
+_EMPTY_INDEX = StandardVariableIndex([])
+
+_index = None
+_loaded_at = 0
+_failed_at = 0
+_refreshing = False
+_lock = threading.Lock()
+
+
+def _refresh(url):
+    global _index, _loaded_at, _failed_at, _refreshing
+    try:
+        start = time.time()
+        index = StandardVariableIndex(fetch_standard_variables(url))
+        log.info('Indexed %d standard variables in %.2fs', len(index), time.time() - start)
+        # Swapping the reference is atomic, readers keep the old index meanwhile
+        _index = index
+        _loaded_at = time.time()
+    except (requests.RequestException, ValueError) as e:
+        log.warning('Could not refresh the standard variables from %s: %s', url, e)
+        _failed_at = time.time()
+    finally:
+        _refreshing = False
+
+
+def _start_refresh(url):
+    global _refreshing
+    with _lock:
+        if _refreshing:
+            return
+        _refreshing = True
+    threading.Thread(target=_refresh, args=(url,), daemon=True).start()
+
+
+def get_index():
+    """
+    Return the standard variables index. It is loaded, and refreshed once
+    stale, in a background thread; until the first load finishes an empty
+    index is returned. Failed loads are retried after RETRY_AFTER_FAILURE
+    seconds.
+    """
+    url = toolkit.config.get('ckanext.dso_scheming.standard_variables_url', DEFAULT_URL)
+    max_age = toolkit.asint(toolkit.config.get(
+        'ckanext.dso_scheming.standard_variables_refresh', DEFAULT_REFRESH))
+
+    now = time.time()
+    stale = _index is None or now - _loaded_at > max_age
+    if stale and now - _failed_at > RETRY_AFTER_FAILURE:
+        _start_refresh(url)
+    return _index if _index is not None else _EMPTY_INDEX
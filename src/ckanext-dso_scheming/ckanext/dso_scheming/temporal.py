@@ -0,0 +1,130 @@
+"""
+Temporal coverage search
+
+The temporal_coverage_start and temporal_coverage_end fields are stored as
+package extras. At index time they are copied to the temporal_start_date and
+temporal_end_date Solr fields (matched by the "*_date" dynamic field of the
+CKAN schema), so a temporal filter is an indexed range query:
+
+    package_search?ext_temporal_start=2010&ext_temporal_end=2015
+
+returns the datasets whose coverage overlaps 2010-2015.
+"""
+
+import calendar
+import datetime
+import logging
+import re
+
+from ckan.lib.search import SearchError
+
+log = logging.getLogger(__name__)
+
+START_FIELD = 'temporal_coverage_start'
+END_FIELD = 'temporal_coverage_end'
+START_INDEX_FIELD = 'temporal_start_date'
+END_INDEX_FIELD = 'temporal_end_date'
+
+SOLR_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+_PARTIAL_DATE_RE = re.compile(r'^(\d{4})(?:-(\d{1,2}))?$')
+
+
+def parse_date(value, end=False):
+    """
+    Parse an ISO date or datetime, or a bare year or year-month, which are
+    extended to their first day or, if `end` is set, to their last second.
+    Raises ValueError for anything else.
+    """
+    value = value.strip()
+    match = _PARTIAL_DATE_RE.match(value)
+    if match:
+        year = int(match.group(1))
+        month = int(match.group(2)) if match.group(2) else None
+        if not end:
+            return datetime.datetime(year, month or 1, 1)
+        month = month or 12
+        day = calendar.monthrange(year, month)[1]
+        return datetime.datetime(year, month, day, 23, 59, 59)
+
+    if 'T' in value or ' ' in value:
+        parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo:
+            parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return parsed
+
+    parsed = datetime.datetime.strptime(value, '%Y-%m-%d')
+    if end:
+        parsed = parsed.replace(hour=23, minute=59, second=59)
+    return parsed
+
+
+def _solr_date(value):
+    return value.strftime(SOLR_DATE_FORMAT)
+
+
+def _pkg_value(pkg_dict, field):
+    # Extras are indexed both as "<field>" and "extras_<field>"
+    return pkg_dict.get(field) or pkg_dict.get('extras_' + field)
+
+
+def index_temporal_coverage(pkg_dict):
+    """
+    Add the Solr date fields for the temporal coverage of the dataset. A
+    missing bound takes the value of the other one.
+    """
+    try:
+        start = _pkg_value(pkg_dict, START_FIELD)
+        end = _pkg_value(pkg_dict, END_FIELD)
+        start = parse_date(start) if start else None
+        end = parse_date(end, end=True) if end else None
+    except ValueError as e:
+        log.warning('Not indexing the temporal coverage of %s: %s',
+                    pkg_dict.get('name'), e)
+        return pkg_dict
+
+    if not start and not end:
+        return pkg_dict
+
+    start, end = start or end, end or start
+    if start > end:
+        start, end = end, start
+
+    pkg_dict[START_INDEX_FIELD] = _solr_date(start)
+    pkg_dict[END_INDEX_FIELD] = _solr_date(end)
+    return pkg_dict
+
+
+def _search_param(search_params, name):
+    # ext_ parameters end up in the extras, the bare ones are not valid Solr
+    # parameters so they are removed before the query is run
+    value = search_params.pop(name, None)
+    extras = search_params.get('extras') or {}
+    return extras.get('ext_' + name) or value
+
+
+def filter_temporal_coverage(search_params):
+    """
+    Turn the temporal_start / temporal_end search parameters into a filter
+    query matching the datasets whose coverage overlaps the given range.
+    """
+    start = _search_param(search_params, 'temporal_start')
+    end = _search_param(search_params, 'temporal_end')
+    if not start and not end:
+        return search_params
+
+    try:
+        start = parse_date(start) if start else None
+        end = parse_date(end, end=True) if end else None
+    except ValueError:
+        raise SearchError('Wrong temporal coverage provided, use ISO dates')
+
+    filters = []
+    if end:
+        filters.append('+{0}:[* TO {1}]'.format(START_INDEX_FIELD, _solr_date(end)))
+    if start:
+        filters.append('+{0}:[{1} TO *]'.format(END_INDEX_FIELD, _solr_date(start)))
+
+    fq = search_params.get('fq', '')
+    search_params['fq'] = ' '.join([fq] + filters).strip()
+    return search_params
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from ckanext.dso_scheming import artifact
+
+SCHEMA_URLS = [
+    'ckanext.dso_scheming:ckan_dataset.yaml',
+    'ckanext.dso_scheming:mint_dataset.yaml',
+    'ckanext.dso_scheming:subside_dataset.yaml',
+]
+PRESET_URLS = [
+    'ckanext.scheming:presets.json',
+    'ckanext.dso_scheming:mint_presets.json',
+]
+
+
+def _write(path, payload):
+    payload = dict(payload, checksum=artifact._checksum(payload))
+    path.write_text(json.dumps(payload))
+    return payload
+
+
+def test_load_artifact(tmp_path):
+    path = tmp_path / 'schemas.json'
+    payload = _write(path, {
+        'version': artifact.ARTIFACT_VERSION,
+        'dataset_schema_urls': [],
+        'preset_urls': [],
+        'sources': {},
+        'presets': {},
+        'schemas': {},
+        'expanded': {},
+    })
+
+    assert artifact.load_artifact(str(path)) == payload
+
+
+def test_load_artifact_rejects_bad_checksum(tmp_path):
+    path = tmp_path / 'schemas.json'
+    payload = _write(path, {
+        'version': artifact.ARTIFACT_VERSION,
+        'sources': {},
+        'presets': {},
+    })
+    payload['presets'] = {'title': {}}
+    path.write_text(json.dumps(payload))
+
+    assert artifact.load_artifact(str(path)) is None
+
+
+def test_load_artifact_missing(tmp_path):
+    assert artifact.load_artifact(str(tmp_path / 'missing.json')) is None
+
+
+@pytest.fixture
+def compiled_path(tmp_path, monkeypatch):
+    from ckanext.scheming import plugins as scheming
+
+    path = str(tmp_path / 'schemas.json')
+    artifact.write_artifact(path, artifact.compile_schemas(SCHEMA_URLS, PRESET_URLS))
+
+    monkeypatch.setattr(artifact, '_artifact', None)
+    monkeypatch.setattr(artifact, '_artifact_loaded', False)
+    monkeypatch.setattr(scheming._SchemingMixin, '_presets', None)
+    artifact.install()
+    return path
+
+
+@pytest.mark.ckan_config('ckan.plugins', 'scheming_datasets dso_scheming')
+@pytest.mark.usefixtures('with_plugins')
+def test_installed_loaders_return_the_artifact(compiled_path):
+    from ckanext.scheming import plugins as scheming
+
+    config = {
+        artifact.ARTIFACT_OPTION: compiled_path,
+        artifact.PRESETS_OPTION: ' '.join(PRESET_URLS),
+    }
+    loaded = artifact.get_artifact(config)
+    assert sorted(loaded['expanded']) == ['dataset', 'mint_dataset', 'subside_dataset']
+
+    scheming._SchemingMixin._load_presets(config)
+    assert scheming._SchemingMixin._presets is loaded['presets']
+
+    schemas = scheming._load_schemas(SCHEMA_URLS, 'dataset_type')
+    assert schemas is loaded['schemas']
+    assert scheming._expand_schemas(schemas) is loaded['expanded']
+
+
+@pytest.mark.ckan_config('ckan.plugins', 'scheming_datasets dso_scheming')
+@pytest.mark.usefixtures('with_plugins')
+def test_installed_loaders_ignore_other_schemas(compiled_path):
+    from ckanext.scheming import plugins as scheming
+
+    artifact.get_artifact({artifact.ARTIFACT_OPTION: compiled_path})
+    schemas = scheming._load_schemas(SCHEMA_URLS[:1], 'dataset_type')
+
+    assert list(schemas) == ['dataset']
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from ckanext.dso_scheming import geometry
+
+
+def test_normalize_geojson_feature_to_geometry():
+    feature = {
+        'type': 'Feature',
+        'properties': {'name': 'area'},
+        'geometry': {'type': 'Point', 'coordinates': [-97.7, 30.3]},
+    }
+
+    assert json.loads(geometry.normalize_geojson(json.dumps(feature))) == {
+        'type': 'Point', 'coordinates': [-97.7, 30.3],
+    }
+
+
+@pytest.mark.parametrize('value', [
+    'not json',
+    '[1, 2]',
+    '{"type": "Feature"}',
+    '{"type": "FeatureCollection", "features": [1]}',
+    '{"type": "FeatureCollection", "features": 1}',
+    '{"type": "Point", "coordinates": [200, 10]}',
+    '{"type": "Polygon", "coordinates": [[[0, 0]]]}',
+])
+def test_normalize_geojson_invalid(value):
+    with pytest.raises(ValueError):
+        geometry.normalize_geojson(value)
+
+
+def test_index_spatial_adds_precomputed_geometries():
+    spatial = '{"type":"Polygon","coordinates":[[[0,0],[2,0],[2,2],[0,2],[0,0]]]}'
+    pkg_dict = geometry.index_spatial({
+        'extras_spatial': spatial,
+        'validated_data_dict': json.dumps({'name': 'test'}),
+    })
+
+    validated = json.loads(pkg_dict['validated_data_dict'])
+    assert validated['spatial_bbox'] == [0, 0, 2, 2]
+    assert validated['spatial_centroid'] == [1, 1]
+    assert json.loads(validated['spatial_simplified'])['type'] == 'Polygon'
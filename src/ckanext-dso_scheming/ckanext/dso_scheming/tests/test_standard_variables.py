@@ -0,0 +1,76 @@
+import threading
+import time
+
+import requests
+
+from ckanext.dso_scheming import standard_variables
+from ckanext.dso_scheming.standard_variables import StandardVariableIndex
+
+
+LABELS = [
+    'atmosphere_water__precipitation_volume_flux',
+    'land_surface_water__runoff_volume_flux',
+    'precipitation',
+    'soil_water__volume_fraction',
+]
+
+
+def test_search_ranks_prefix_matches_first():
+    index = StandardVariableIndex(LABELS)
+
+    assert index.search('precip') == [
+        'precipitation',
+        'atmosphere_water__precipitation_volume_flux',
+    ]
+
+
+def test_search_short_terms_match_word_prefixes():
+    index = StandardVariableIndex(LABELS)
+
+    assert index.search('ru') == ['land_surface_water__runoff_volume_flux']
+
+
+def test_search_substring_and_limit():
+    index = StandardVariableIndex(LABELS)
+
+    assert len(index.search('water', limit=2)) == 2
+    assert index.search('ater__run') == ['land_surface_water__runoff_volume_flux']
+    assert index.search('nothing') == []
+    assert index.search('  ') == []
+
+
+def test_get_index_loads_in_the_background(monkeypatch):
+    loaded = threading.Event()
+
+    def fetch(url):
+        loaded.wait(5)
+        return set(LABELS)
+
+    monkeypatch.setattr(standard_variables, 'fetch_standard_variables', fetch)
+    monkeypatch.setattr(standard_variables, '_index', None)
+    monkeypatch.setattr(standard_variables, '_failed_at', 0)
+
+    assert len(standard_variables.get_index()) == 0
+
+    loaded.set()
+    for _ in range(50):
+        if standard_variables._index is not None:
+            break
+        time.sleep(0.01)
+    assert len(standard_variables.get_index()) == len(LABELS)
+
+
+def test_get_index_retries_failed_refresh(monkeypatch):
+    def fetch(url):
+        raise requests.ConnectionError('down')
+
+    monkeypatch.setattr(standard_variables, 'fetch_standard_variables', fetch)
+    monkeypatch.setattr(standard_variables, '_index', StandardVariableIndex(LABELS))
+    monkeypatch.setattr(standard_variables, '_loaded_at', 0)
+    monkeypatch.setattr(standard_variables, '_failed_at', 0)
+
+    standard_variables._refresh('http://example.com')
+
+    assert standard_variables._loaded_at == 0
+    assert time.time() - standard_variables._failed_at < standard_variables.RETRY_AFTER_FAILURE
+    assert len(standard_variables.get_index()) == len(LABELS)
@@ -0,0 +1,50 @@
+import datetime
+
+import pytest
+
+from ckan.lib.search import SearchError
+
+from ckanext.dso_scheming import temporal
+
+
+def test_parse_date_partial_dates():
+    assert temporal.parse_date('2010') == datetime.datetime(2010, 1, 1)
+    assert temporal.parse_date('2015', end=True) == datetime.datetime(2015, 12, 31, 23, 59, 59)
+    assert temporal.parse_date('2016-02', end=True) == datetime.datetime(2016, 2, 29, 23, 59, 59)
+    assert temporal.parse_date('2010-05-04') == datetime.datetime(2010, 5, 4)
+
+
+def test_index_temporal_coverage():
+    pkg_dict = temporal.index_temporal_coverage({
+        'extras_temporal_coverage_start': '2012-03-01',
+        'extras_temporal_coverage_end': '2014-06-30',
+    })
+
+    assert pkg_dict['temporal_start_date'] == '2012-03-01T00:00:00Z'
+    assert pkg_dict['temporal_end_date'] == '2014-06-30T23:59:59Z'
+
+
+def test_index_temporal_coverage_single_bound_and_invalid():
+    pkg_dict = temporal.index_temporal_coverage({'temporal_coverage_start': '2012-03-01'})
+    assert pkg_dict['temporal_end_date'] == '2012-03-01T00:00:00Z'
+
+    pkg_dict = temporal.index_temporal_coverage({'temporal_coverage_start': 'soon'})
+    assert 'temporal_start_date' not in pkg_dict
+
+
+def test_filter_temporal_coverage_overlap():
+    search_params = temporal.filter_temporal_coverage({
+        'fq': '+dataset_type:dataset',
+        'extras': {'ext_temporal_start': '2010', 'ext_temporal_end': '2015'},
+    })
+
+    assert search_params['fq'] == (
+        '+dataset_type:dataset'
+        ' +temporal_start_date:[* TO 2015-12-31T23:59:59Z]'
+        ' +temporal_end_date:[2010-01-01T00:00:00Z TO *]'
+    )
+
+
+def test_filter_temporal_coverage_invalid():
+    with pytest.raises(SearchError):
+        temporal.filter_temporal_coverage({'temporal_start': 'yesterday'})
@@ -0,0 +1,35 @@
+import json
+import os
+
+import pytest
+import yaml
+
+import ckan.plugins.toolkit as toolkit
+
+from ckanext.dso_scheming import validators
+
+POINT = {'type': 'Point', 'coordinates': [-97.7, 30.3]}
+
+
+def test_geojson_accepts_dict():
+    assert json.loads(validators.geojson(POINT, {})) == POINT
+
+
+def test_geojson_accepts_string():
+    assert json.loads(validators.geojson(json.dumps(POINT), {})) == POINT
+
+
+def test_geojson_invalid():
+    with pytest.raises(toolkit.Invalid):
+        validators.geojson('{"type": "Point"}', {})
+
+
+def test_geojson_runs_before_unicode_safe():
+    # unicode_safe would turn a dict into its Python repr
+    path = os.path.join(os.path.dirname(validators.__file__), 'ckan_dataset.yaml')
+    with open(path) as f:
+        schema = yaml.safe_load(f)
+    spatial = next(f for f in schema['dataset_fields'] if f['field_name'] == 'spatial')
+
+    names = spatial['validators'].split()
+    assert names.index('dso_scheming_geojson') < names.index('unicode_safe')
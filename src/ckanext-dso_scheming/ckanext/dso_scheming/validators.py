@@ -0,0 +1,19 @@
+import ckan.plugins.toolkit as toolkit
+
+from ckanext.dso_scheming import geometry
+
+
+def geojson(value, context):
+    """Validate and normalize a GeoJSON spatial coverage"""
+    if value is toolkit.missing or not value:
+        return value
+    try:
+        return geometry.normalize_geojson(value)
+    except ValueError as e:
+        raise toolkit.Invalid(toolkit._('Invalid GeoJSON: {}').format(e))
+
+
+def get_validators():
+    return {
+        'dso_scheming_geojson': geojson,
+    }
@@ -0,0 +1,50 @@
+import json
+
+from flask import Blueprint, make_response, request
+
+import ckan.plugins.toolkit as toolkit
+
+from ckanext.dso_scheming import standard_variables
+
+MAX_LIMIT = 50
+
+dso_scheming = Blueprint('dso_scheming', __name__)
+
+
+def standard_variable_autocomplete():
+    """
+    Autocomplete for the mint_variable_string_autocomplete preset, answered
+    from the local standard variables index in the same format as CKAN's
+    tag autocomplete
+    """
+    term = request.args.get('incomplete', '')
+    try:
+        limit = min(int(request.args.get('limit', 10)), MAX_LIMIT)
+    except ValueError:
+        limit = 10
+
+    index = standard_variables.get_index()
+    result = [{'Name': label} for label in index.search(term, limit)]
+
+    response = make_response(json.dumps({'ResultSet': {'Result': result}}))
+    response.headers['Content-Type'] = 'application/json;charset=utf-8'
+    if not len(index):
+        # Still loading, don't let the empty result be cached
+        response.cache_control.no_store = True
+        return response
+
+    response.cache_control.public = True
+    response.cache_control.max_age = toolkit.asint(toolkit.config.get(
+        'ckanext.dso_scheming.standard_variables_max_age', 3600))
+    # The URL already identifies the term and limit
+    response.set_etag(index.version)
+    return response.make_conditional(request)
+
+
+dso_scheming.add_url_rule(
+    '/api/2/util/standard_variable/autocomplete',
+    view_func=standard_variable_autocomplete)
+
+
+def get_blueprints():
+    return [dso_scheming]
@@ -7,6 +7,27 @@ from typing import (
 from markupsafe import Markup, escape
 from markdown import markdown
 import re
+import json
+import logging
+
+log = logging.getLogger(__name__)
+
+_static_manifest = None
+
+
+def _load_static_manifest():
+    """Load the manifest written by collect_static.py, once per process"""
+    global _static_manifest
+    if _static_manifest is None:
+        path = toolkit.config.get('ckanext.tacc_theme.static_manifest', '/srv/app/static/manifest.json')
+        try:
+            with open(path) as f:
+                _static_manifest = json.load(f)
+        except (IOError, ValueError) as e:
+            log.debug(f"Static manifest not loaded from {path}: {e}")
+            _static_manifest = {}
+    return _static_manifest
+
 
 class TaccThemePlugin(plugins.SingletonPlugin):
     plugins.implements(plugins.IConfigurer)
@@ -25,6 +46,7 @@ class TaccThemePlugin(plugins.SingletonPlugin):
         return {
             'get_dynamo_dashboard_url': self.get_dynamo_dashboard_url,
             'get_ensemble_manager_api_url': self.get_ensemble_manager_api_url,
+            'get_static_asset_url': self.get_static_asset_url,
         }
 
     def get_dynamo_dashboard_url(self):
@@ -35,6 +57,11 @@ class TaccThemePlugin(plugins.SingletonPlugin):
         """Get the Ensemble Manager API URL from CKAN configuration"""
         return toolkit.config.get('ckanext.tacc_theme.ensemble_manager_api_url', 'https://ensemble-manager.mint.tacc.utexas.edu/v1')
 
+    def get_static_asset_url(self, path):
+        """Get the fingerprinted URL served by nginx for a public/ file, or
+        the plain CKAN URL if the static files have not been collected"""
+        return _load_static_manifest().get(path, path)
+
     def markdown_extract_paragraphs(text: str, extract_length: int = 190) -> Union[str, Markup]:
         ''' return the plain text representation of markdown (ie: text without any html tags)
         as a list of paragraph strings.'''
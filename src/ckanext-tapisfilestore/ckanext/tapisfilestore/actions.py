@@ -0,0 +1,153 @@
+"""
+API actions of the tapisfilestore extension
+
+File: ckanext/tapisfilestore/actions.py
+"""
+
+import datetime
+import fnmatch
+import logging
+import mimetypes
+import time
+import requests
+
+import ckan.plugins as plugins
+import ckan.plugins.toolkit as toolkit
+
+from ckanext.tapisfilestore.tapis import list_files, strip_tapis_scheme
+
+log = logging.getLogger(__name__)
+
+
+def _last_modified(value):
+    """Tapis timestamps are UTC ISO datetimes, CKAN stores them naive"""
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def file_resource(file_info, system, defaults=None):
+    """Build the resource dict of a file from its Files API listing entry"""
+    url = file_info.url
+    if not url or not url.startswith('tapis://'):
+        url = f"tapis://{system}/{file_info.path.lstrip('/')}"
+
+    mimetype = file_info.mimeType or mimetypes.guess_type(file_info.name)[0]
+    extension = file_info.name.rsplit('.', 1)[-1] if '.' in file_info.name else ''
+
+    resource = dict(defaults or {})
+    resource.update({
+        'name': file_info.name,
+        'url': url,
+        'size': file_info.size,
+        'mimetype': mimetype,
+        'format': extension.upper(),
+    })
+    last_modified = _last_modified(file_info.lastModified)
+    if last_modified:
+        resource['last_modified'] = last_modified
+    return resource
+
+
+def _tapis_token(data_dict):
+    if data_dict.get('tapis_token'):
+        return data_dict['tapis_token']
+    plugin = plugins.get_plugin('tapisfilestore')
+    return plugin._get_tapis_token() if plugin else None
+
+
+def tapis_directory_register(context, data_dict):
+    """
+    Register the files of a Tapis directory as resources of a dataset, with
+    a single package update (and Solr reindex) for all of them. Files already
+    registered in the dataset are skipped.
+
+    :param id: the id or name of the dataset
+    :param path: the Tapis directory, as system/path or tapis://system/path
+    :param pattern: only register the file names matching this glob pattern
+        (optional)
+    :param recursive: also register the files of the subdirectories
+        (optional, default: False)
+    :param resource_defaults: fields to set on every new resource (optional)
+    :param tapis_token: the Tapis token to list the directory with, defaults
+        to the token of the current user (optional)
+
+    :returns: the number of files listed and registered and the time taken
+    :rtype: dictionary
+    """
+    package_id, path = toolkit.get_or_bust(data_dict, ['id', 'path'])
+    toolkit.check_access('tapis_directory_register', context, data_dict)
+
+    pattern = data_dict.get('pattern') or '*'
+    recursive = toolkit.asbool(data_dict.get('recursive', False))
+    defaults = data_dict.get('resource_defaults') or {}
+    if not isinstance(defaults, dict):
+        raise toolkit.ValidationError({'resource_defaults': ['Must be a dictionary']})
+
+    tapis_token = _tapis_token(data_dict)
+    if not tapis_token:
+        raise toolkit.ValidationError({'tapis_token': ['No Tapis token found']})
+
+    path = strip_tapis_scheme(path)
+    system = path.split('/', 1)[0]
+    start = time.time()
+
+    pkg_dict = toolkit.get_action('package_show')(dict(context), {'id': package_id})
+    for resource in pkg_dict['resources']:
+        # before_show replaced the tapis:// URL with the download route, the
+        # original has to be saved back
+        if resource.get('tapis_original_url'):
+            resource['url'] = resource.pop('tapis_original_url')
+    registered = {resource.get('url') for resource in pkg_dict['resources']}
+
+    listed = 0
+    new_resources = []
+    try:
+        with requests.Session() as session:
+            for file_info in list_files(path, tapis_token, recurse=recursive, session=session):
+                if file_info.type == 'dir':
+                    continue
+                listed += 1
+                if not fnmatch.fnmatch(file_info.name, pattern):
+                    continue
+                resource = file_resource(file_info, system, defaults)
+                if resource['url'] not in registered:
+                    registered.add(resource['url'])
+                    new_resources.append(resource)
+    except requests.HTTPError as e:
+        raise toolkit.ValidationError(
+            {'path': [f'Could not list {path}: {e.response.status_code}']})
+    except (requests.RequestException, ValueError) as e:
+        raise toolkit.ValidationError({'path': [f'Could not list {path}: {e}']})
+    listing_time = time.time() - start
+
+    if new_resources:
+        pkg_dict['resources'].extend(new_resources)
+        toolkit.get_action('package_update')(context, pkg_dict)
+    total_time = time.time() - start
+
+    result = {
+        'id': pkg_dict['id'],
+        'path': path,
+        'files': listed,
+        'registered': len(new_resources),
+        'skipped': listed - len(new_resources),
+        'listing_seconds': round(listing_time, 2),
+        'update_seconds': round(total_time - listing_time, 2),
+        'total_seconds': round(total_time, 2),
+        'seconds_per_1000_files': round(total_time / len(new_resources) * 1000, 2)
+        if new_resources else None,
+    }
+    log.info(f"Registered {len(new_resources)} of {listed} files of {path} in "
+             f"{pkg_dict['name']} in {total_time:.2f}s")
+    return result
+
+
+def get_actions():
+    return {
+        'tapis_directory_register': tapis_directory_register,
+    }
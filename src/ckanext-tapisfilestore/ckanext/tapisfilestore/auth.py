@@ -0,0 +1,18 @@
+"""
+Authorization functions of the tapisfilestore extension
+
+File: ckanext/tapisfilestore/auth.py
+"""
+
+from ckan import authz
+
+
+def tapis_directory_register(context, data_dict):
+    """Registering files takes the same permission as editing the dataset"""
+    return authz.is_authorized('package_update', context, {'id': data_dict.get('id')})
+
+
+def get_auth_functions():
+    return {
+        'tapis_directory_register': tapis_directory_register,
+    }
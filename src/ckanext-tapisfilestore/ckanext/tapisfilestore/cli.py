@@ -0,0 +1,69 @@
+import json
+
+import click
+
+import ckan.plugins.toolkit as toolkit
+
+from ckanext.tapisfilestore import health
+
+
+@click.group()
+def tapisfilestore():
+    """tapisfilestore commands"""
+    pass
+
+
+@tapisfilestore.command('register-directory')
+@click.argument('dataset')
+@click.argument('path')
+@click.option('-p', '--pattern', default='*', show_default=True,
+              help='Only register the file names matching this glob pattern')
+@click.option('-r', '--recursive', is_flag=True, help='Include the subdirectories')
+@click.option('-t', '--token', envvar='TAPIS_TOKEN', required=True,
+              help='Tapis token used to list the directory (or TAPIS_TOKEN)')
+def register_directory(dataset, path, pattern, recursive, token):
+    """Register the files of the Tapis directory PATH as resources of DATASET"""
+    site_user = toolkit.get_action('get_site_user')({'ignore_auth': True}, {})
+    context = {'user': site_user['name'], 'ignore_auth': True}
+    try:
+        result = toolkit.get_action('tapis_directory_register')(context, {
+            'id': dataset,
+            'path': path,
+            'pattern': pattern,
+            'recursive': recursive,
+            'tapis_token': token,
+        })
+    except toolkit.ObjectNotFound:
+        raise click.ClickException(f'Dataset {dataset} not found')
+    except toolkit.ValidationError as e:
+        raise click.ClickException(str(e.error_dict))
+
+    click.secho(f"Registered {result['registered']} of {result['files']} files "
+                f"in {result['total_seconds']}s", fg='green')
+    click.echo(json.dumps(result, indent=2))
+
+
+@tapisfilestore.command('check-links')
+@click.option('-w', '--workers', default=16, show_default=True, help='Concurrent requests')
+@click.option('--rate', default=10.0, show_default=True,
+              help='Maximum requests per second to each host, 0 for no limit')
+@click.option('-t', '--token', envvar='TAPIS_TOKEN', required=True,
+              help='Tapis token used to check the files (or TAPIS_TOKEN)')
+@click.option('--dry-run', is_flag=True, help="Only report, don't update the resources")
+@click.option('-o', '--output', type=click.File('w'), help='Write the JSON report to this file')
+def check_links(workers, rate, token, dry_run, output):
+    """Check that the file of every tapis:// resource still exists"""
+    report = health.check_links(token, workers=workers, rate=rate, dry_run=dry_run)
+
+    color = 'green' if not report['broken'] else 'red'
+    click.secho(f"Checked {report['checked']} tapis:// resources in "
+                f"{report['total_seconds']}s: {report['ok']} ok, "
+                f"{report['broken']} broken", fg=color)
+    for link in report['broken_links']:
+        click.echo(f"  {link['status']} {link['url']} (resource {link['resource_id']})")
+    if output:
+        json.dump(report, output, indent=2)
+
+
+def get_commands():
+    return [tapisfilestore]
@@ -0,0 +1,208 @@
+"""
+Link health of the tapis:// resources
+
+File: ckanext/tapisfilestore/health.py
+
+check_links() requests the Files API info of every tapis:// resource from a
+bounded thread pool sharing one connection pool, with the requests to each
+host spaced by a rate limit. The status and latency are stored in the
+resource extras, and the files that were not found are cached in Redis so
+serve_tapis_file answers them without calling Tapis.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import datetime
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from redis.exceptions import RedisError
+
+import ckan.plugins.toolkit as toolkit
+from ckan import model
+from ckan.lib import search
+from ckan.lib.redis import connect_to_redis
+
+from ckanext.tapisfilestore.tapis import check_file, file_info_url, make_session
+
+log = logging.getLogger(__name__)
+
+DEAD_LINK_TTL_OPTION = 'ckanext.tapisfilestore.dead_link_ttl'
+DEFAULT_DEAD_LINK_TTL = 24 * 60 * 60
+
+# Only a missing file is dead for everybody, a 401 or 403 for the token of
+# the scan may not be one for the token of the user
+DEAD_STATUSES = (404,)
+
+# Status recorded when Tapis could not be reached
+NETWORK_ERROR = 0
+
+COMMIT_EVERY = 500
+
+
+class HostRateLimiter(object):
+    """Space the requests to each host at least 1 / `rate` seconds apart"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _dead_link_key(tapis_path):
+    return f"tapisfilestore:dead_link:{tapis_path.strip('/')}"
+
+
+def _dead_link_ttl():
+    return toolkit.asint(toolkit.config.get(DEAD_LINK_TTL_OPTION, DEFAULT_DEAD_LINK_TTL))
+
+
+def get_dead_link_status(tapis_path):
+    """Return the cached status of a known dead file, or None"""
+    try:
+        status = connect_to_redis().get(_dead_link_key(tapis_path))
+    except RedisError as e:
+        log.debug(f"Could not read the dead link cache: {e}")
+        return None
+    return int(status) if status else None
+
+
+def _check(session, limiter, tapis_path, tapis_token):
+    limiter.wait(file_info_url(tapis_path))
+    start = time.monotonic()
+    try:
+        status = check_file(tapis_path, tapis_token, session=session).status_code
+    except requests.RequestException as e:
+        log.debug(f"Could not check {tapis_path}: {e}")
+        status = NETWORK_ERROR
+    return status, (time.monotonic() - start) * 1000
+
+
+def tapis_resources():
+    """The active tapis:// resources of the active datasets"""
+    return model.Session.query(model.Resource) \
+        .join(model.Package, model.Package.id == model.Resource.package_id) \
+        .filter(model.Package.state == 'active') \
+        .filter(model.Resource.state == 'active') \
+        .filter(model.Resource.url.like('tapis://%')) \
+        .all()
+
+
+def _record(resource, status, latency_ms, checked):
+    """Store the result in the resource extras, return True if the status changed"""
+    extras = dict(resource.extras or {})
+    changed = extras.get('tapis_link_status') != status
+    extras.update({
+        'tapis_link_status': status,
+        'tapis_link_latency_ms': round(latency_ms, 1),
+        'tapis_link_checked': checked,
+    })
+    # Assign a new dict so SQLAlchemy sees the change of the JSON column
+    resource.extras = extras
+    return changed
+
+
+def _cache_statuses(statuses):
+    """Cache the dead files and forget the ones that are back"""
+    ttl = _dead_link_ttl()
+    try:
+        pipeline = connect_to_redis().pipeline(transaction=False)
+        for tapis_path, status in statuses.items():
+            if status in DEAD_STATUSES:
+                pipeline.setex(_dead_link_key(tapis_path), ttl, status)
+            elif status != NETWORK_ERROR:
+                pipeline.delete(_dead_link_key(tapis_path))
+        pipeline.execute()
+    except RedisError as e:
+        log.warning(f"Could not update the dead link cache: {e}")
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def check_links(tapis_token, workers=16, rate=10, dry_run=False):
+    """
+    Check every tapis:// resource against the Files API and return a summary
+    report. Unless `dry_run` is set the results are stored in the resource
+    extras and the datasets whose links changed status are reindexed.
+    """
+    resources = tapis_resources()
+    limiter = HostRateLimiter(rate)
+    checked = datetime.datetime.utcnow().isoformat()
+    start = time.time()
+
+    statuses = {}
+    latencies = []
+    broken = []
+    changed_packages = set()
+    with make_session(pool_size=workers) as session, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_check, session, limiter, resource.url[8:], tapis_token): resource
+            for resource in resources
+        }
+        # Results are recorded from this thread only, the SQLAlchemy session
+        # is not thread safe
+        for done, future in enumerate(as_completed(futures), 1):
+            resource = futures[future]
+            status, latency_ms = future.result()
+            statuses[resource.url[8:]] = status
+            latencies.append(latency_ms)
+            if status != 200:
+                broken.append({
+                    'resource_id': resource.id,
+                    'package_id': resource.package_id,
+                    'url': resource.url,
+                    'status': status,
+                })
+            if not dry_run:
+                if _record(resource, status, latency_ms, checked):
+                    changed_packages.add(resource.package_id)
+                if done % COMMIT_EVERY == 0:
+                    model.repo.commit()
+
+    if not dry_run:
+        model.repo.commit()
+        _cache_statuses(statuses)
+        if changed_packages:
+            search.rebuild(package_ids=list(changed_packages), defer_commit=True)
+            search.commit()
+
+    counts = {}
+    for status in statuses.values():
+        counts[str(status)] = counts.get(str(status), 0) + 1
+
+    elapsed = time.time() - start
+    report = {
+        'checked': len(resources),
+        'ok': counts.get('200', 0),
+        'broken': len(broken),
+        'statuses': counts,
+        'reindexed_datasets': len(changed_packages),
+        'total_seconds': round(elapsed, 2),
+        'checks_per_second': round(len(resources) / elapsed, 1) if elapsed else None,
+        'broken_links': broken,
+    }
+    if latencies:
+        report.update({
+            'latency_p50_ms': round(_percentile(latencies, 50), 1),
+            'latency_p95_ms': round(_percentile(latencies, 95), 1),
+        })
+    log.info(f"Checked {len(resources)} tapis:// resources in {elapsed:.2f}s, "
+             f"{len(broken)} broken")
+    return report
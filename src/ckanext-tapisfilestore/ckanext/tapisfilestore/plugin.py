@@ -7,10 +7,8 @@ Similar to ckanext-s3filestore but for Tapis file system
 File: ckanext/tapisfilestore/plugin.py
 """
 
-from dataclasses import dataclass
 import json
 import logging
-import requests
 import mimetypes
 from urllib.parse import quote, unquote
 from flask import Response, stream_with_context, request
@@ -20,26 +18,18 @@ import ckan.plugins.toolkit as toolkit
 from ckan.common import config
 import ckan.lib.helpers as h
 
-log = logging.getLogger(__name__)
+from ckanext.tapisfilestore import actions, auth, cli, health, tapis
 
-@dataclass
-class TapisFileInfo:
-    mimeType: str
-    type: str
-    owner: str
-    group: str
-    nativePermissions: str
-    url: str
-    lastModified: str
-    name: str
-    path: str
-    size: int
+log = logging.getLogger(__name__)
 
 
 class TapisFilestorePlugin(plugins.SingletonPlugin):
     plugins.implements(plugins.IConfigurer)
     plugins.implements(plugins.IResourceController, inherit=True)
     plugins.implements(plugins.IBlueprint)
+    plugins.implements(plugins.IActions)
+    plugins.implements(plugins.IAuthFunctions)
+    plugins.implements(plugins.IClick)
 
     # IConfigurer
     def update_config(self, config_):
@@ -47,6 +37,18 @@ class TapisFilestorePlugin(plugins.SingletonPlugin):
         toolkit.add_public_directory(config_, 'public')
         toolkit.add_resource('fanstatic', 'tapisfilestore')
 
+    # IActions
+    def get_actions(self):
+        return actions.get_actions()
+
+    # IAuthFunctions
+    def get_auth_functions(self):
+        return auth.get_auth_functions()
+
+    # IClick
+    def get_commands(self):
+        return cli.get_commands()
+
     # IBlueprint
     def get_blueprint(self):
         from flask import Blueprint
@@ -142,24 +144,14 @@ class TapisFilestorePlugin(plugins.SingletonPlugin):
         """
         Get the MIME type for a file
         """
-        url = f"https://portals.tapis.io/v3/files/ops/{file_path}"
-        headers = {
-            'x-tapis-token': tapis_token,
-            'Accept': '*/*'
-        }
-        return requests.get(url, headers=headers)
+        return tapis.check_file(file_path, tapis_token)
 
 
     def request_file_content(self, file_path, tapis_token) -> Response:
         """
         Get the content of a file
         """
-        url = f"https://portals.tapis.io/v3/files/content/{file_path}"
-        headers = {
-            'x-tapis-token': tapis_token,
-            'Accept': '*/*'
-        }
-        return requests.get(url, headers=headers, stream=True)
+        return tapis.file_content(file_path, tapis_token)
 
     def get_mime_type(self, response_file_info) -> str:
         try:
@@ -183,6 +175,11 @@ class TapisFilestorePlugin(plugins.SingletonPlugin):
             else:
                 return Response('You must be logged in to access this resource. Please log in and try again.', status=401)
 
+        # Files found missing by the link checker
+        dead_link_status = health.get_dead_link_status(file_path)
+        if dead_link_status:
+            return self.intercept_errors(dead_link_status, file_path)
+
         response_file_info = self.request_file_info(file_path, tapis_token)
         if self.intercept_errors(response_file_info.status_code, file_path):
             return self.intercept_errors(response_file_info.status_code, file_path)
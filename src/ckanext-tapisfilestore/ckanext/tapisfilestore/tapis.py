@@ -0,0 +1,106 @@
+"""
+Tapis Files API client
+
+File: ckanext/tapisfilestore/tapis.py
+"""
+
+from dataclasses import dataclass, fields
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger(__name__)
+
+TAPIS_FILES_URL = 'https://portals.tapis.io/v3/files'
+
+# Largest page the Files API returns for a listing
+LISTING_PAGE_SIZE = 1000
+
+
+@dataclass
+class TapisFileInfo:
+    mimeType: str
+    type: str
+    owner: str
+    group: str
+    nativePermissions: str
+    url: str
+    lastModified: str
+    name: str
+    path: str
+    size: int
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from a Files API listing entry, ignoring unknown keys"""
+        return cls(**{f.name: data.get(f.name) for f in fields(cls)})
+
+
+def strip_tapis_scheme(path):
+    """Turn tapis://system/path or /system/path into system/path"""
+    if path.startswith('tapis://'):
+        path = path[8:]
+    return path.strip('/')
+
+
+def file_info_url(path):
+    return f"{TAPIS_FILES_URL}/ops/{strip_tapis_scheme(path)}"
+
+
+def file_content_url(path):
+    return f"{TAPIS_FILES_URL}/content/{strip_tapis_scheme(path)}"
+
+
+def _headers(tapis_token, accept='application/json'):
+    return {
+        'x-tapis-token': tapis_token,
+        'Accept': accept
+    }
+
+
+def list_files(path, tapis_token, recurse=False, page_size=LISTING_PAGE_SIZE, session=None):
+    """
+    Yield a TapisFileInfo for every entry under the system/path directory,
+    requesting the listing page by page
+    """
+    session = session or requests
+    url = file_info_url(path)
+    headers = _headers(tapis_token)
+    offset = 0
+    while True:
+        response = session.get(url, headers=headers, params={
+            'limit': page_size,
+            'offset': offset,
+            'recurse': 'true' if recurse else 'false',
+        }, timeout=60)
+        response.raise_for_status()
+        result = response.json().get('result') or []
+        log.debug(f"Listed {len(result)} entries of {path} at offset {offset}")
+        for entry in result:
+            yield TapisFileInfo.from_dict(entry)
+        if len(result) < page_size:
+            break
+        offset += page_size
+
+
+def make_session(pool_size=10):
+    """A Session keeping up to `pool_size` connections open to each host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def check_file(path, tapis_token, session=None, timeout=30):
+    """Request the Files API info of a single file, without its content"""
+    session = session or requests
+    return session.get(file_info_url(path), headers=_headers(tapis_token),
+                       params={'limit': 1}, timeout=timeout)
+
+
+def file_content(path, tapis_token, session=None, timeout=30):
+    """Request the content of a file, streamed"""
+    session = session or requests
+    return session.get(file_content_url(path), headers=_headers(tapis_token, '*/*'),
+                       stream=True, timeout=timeout)
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from ckanext.tapisfilestore.actions import file_resource
+from ckanext.tapisfilestore.tapis import TapisFileInfo, check_file, file_content, list_files
+
+
+def _entry(name, type_='file', size=10):
+    return {
+        'mimeType': None,
+        'type': type_,
+        'owner': 'owner',
+        'group': 'group',
+        'nativePermissions': 'rw-r--r--',
+        'url': f'tapis://system/runs/{name}',
+        'lastModified': '2024-03-01T10:00:00Z',
+        'name': name,
+        'path': f'runs/{name}',
+        'size': size,
+    }
+
+
+def _session(pages):
+    session = mock.Mock()
+    session.get.side_effect = [
+        mock.Mock(**{'json.return_value': {'result': page}}) for page in pages
+    ]
+    return session
+
+
+def test_list_files_follows_pages():
+    pages = [[_entry('a.csv'), _entry('b.csv')], [_entry('c.csv')]]
+    session = _session(pages)
+
+    files = list(list_files('tapis://system/runs', 'token', page_size=2, session=session))
+
+    assert [f.name for f in files] == ['a.csv', 'b.csv', 'c.csv']
+    assert session.get.call_count == 2
+    url = session.get.call_args[0][0]
+    assert url == 'https://portals.tapis.io/v3/files/ops/system/runs'
+    assert session.get.call_args[1]['params']['offset'] == 2
+
+
+def test_file_requests_share_the_base_url_and_token():
+    session = mock.Mock()
+
+    check_file('tapis://system/runs/a.csv', 'token', session=session)
+    file_content('system/runs/a.csv', 'token', session=session)
+
+    (info_url,), info_kwargs = session.get.call_args_list[0]
+    (content_url,), content_kwargs = session.get.call_args_list[1]
+    assert info_url == 'https://portals.tapis.io/v3/files/ops/system/runs/a.csv'
+    assert content_url == 'https://portals.tapis.io/v3/files/content/system/runs/a.csv'
+    assert info_kwargs['headers']['x-tapis-token'] == 'token'
+    assert content_kwargs['headers']['x-tapis-token'] == 'token'
+    assert content_kwargs['stream'] is True
+
+
+def test_file_resource_uses_listing_metadata():
+    file_info = TapisFileInfo.from_dict(dict(_entry('output.nc', size=2048), extra='ignored'))
+
+    resource = file_resource(file_info, 'system', {'description': 'Model run'})
+
+    assert resource['url'] == 'tapis://system/runs/output.nc'
+    assert resource['size'] == 2048
+    assert resource['mimetype'] == 'application/x-netcdf'
+    assert resource['format'] == 'NC'
+    assert resource['last_modified'] == '2024-03-01T10:00:00'
+    assert resource['description'] == 'Model run'
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from ckanext.tapisfilestore import health
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = health.HostRateLimiter(rate=2)
+
+    with mock.patch.object(health.time, 'monotonic', return_value=100.0), \
+            mock.patch.object(health.time, 'sleep') as sleep:
+        limiter.wait('https://portals.tapis.io/v3/files/ops/a')
+        limiter.wait('https://portals.tapis.io/v3/files/ops/b')
+        limiter.wait('https://portals.tapis.io/v3/files/ops/c')
+        limiter.wait('https://other.tapis.io/v3/files/ops/d')
+
+    assert [c.args[0] for c in sleep.call_args_list] == [0.5, 1.0]
+
+
+def test_rate_limiter_disabled():
+    limiter = health.HostRateLimiter(rate=0)
+
+    with mock.patch.object(health.time, 'sleep') as sleep:
+        limiter.wait('https://portals.tapis.io/v3/files/ops/a')
+        limiter.wait('https://portals.tapis.io/v3/files/ops/a')
+
+    sleep.assert_not_called()
+
+
+def test_record_stores_status_in_extras():
+    resource = SimpleNamespace(extras={'tapis_link_status': 200, 'other': 'kept'})
+
+    assert health._record(resource, 404, 12.34, '2024-03-01T10:00:00') is True
+    assert resource.extras == {
+        'other': 'kept',
+        'tapis_link_status': 404,
+        'tapis_link_latency_ms': 12.3,
+        'tapis_link_checked': '2024-03-01T10:00:00',
+    }
+    assert health._record(resource, 404, 10, '2024-03-02T10:00:00') is False